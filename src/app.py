@@ -1,60 +1,194 @@
+import os  # Environment variables for the cache backend
+from functools import lru_cache  # Caching of per-date-range correlation matrices
+import numpy as np  # NumPy for vectorised array operations
 import pandas as pd  # Pandas for data manipulation
+import flask  # Flask server underneath Dash, used to serve the SHAP plot file
 import dash  # Dash library for creating web applications
 from dash import dcc, html, dash_table  # Components for building layout
-from dash.dependencies import Input, Output  # Callbacks to update layout based on user input
+from dash.dependencies import Input, Output, State, ClientsideFunction  # Callbacks to update layout based on user input
 import plotly.express as px  # Plotly Express for creating interactive visualizations
 import plotly.graph_objects as go  # Plotly Graph Objects for more control over visualizations
+import plotly.io as pio  # Plotly templates, shared with the clientside figures
+from flask_caching import Cache  # Memoization of figures built by the callbacks
+from flask_compress import Compress  # Compression of the responses sent to the browser
+from data import load_instrument_cols, load_all  # Dataset loading
 
-# Load the dataset
-data_path = "Solar_Orbiter_with_anomalies.csv"  # Path to dataset file
-data_path2 = "Solar_Orbiter_with_anomalies2.csv"
-solar_data = pd.read_csv(data_path)  # Read dataset into DataFrame
-solar_data2 = pd.read_csv(data_path2)   
+# Load the datasets, shared with the other scripts through data.py
+instrument_cols = load_instrument_cols()  # Instruments that can be selected
+solar_data, solar_data2, shap_data = load_all()  # Instrument readings, anomaly scores and SHAP values data
 
-# Load the SHAP values data
-shap_values_path = "shap_values.csv"  # Update with the correct path to your SHAP values CSV
-shap_data = pd.read_csv(shap_values_path)
 
-# Create the feature importance figure
-feature_importance_fig = px.line(shap_data, x='Date', y=shap_data.columns[:-1],
+def m4_indices(values, width=800):
+    """
+    Select the rows kept by M4 downsampling: the first, last, minimum and maximum of each pixel column.
+    Args:
+    values (ndarray): 1-D series, or 2-D array with one column per series sharing the same x-grid.
+    width (int): Chart width in pixels, i.e. the number of bins.
+    Returns:
+    idx (ndarray): Sorted row positions to plot; the whole range if the data already fits in 4 * width points.
+    """
+    n = len(values)
+    if n <= 4 * width:
+        return np.arange(n)
+    bins = np.linspace(0, n, width + 1).astype(int)
+    picks = [bins[:-1], bins[1:] - 1]  # First and last row of each bin
+    for start, end in zip(bins[:-1], bins[1:]):
+        picks.append(np.ravel(start + np.argmin(values[start:end], axis=0)))  # Minimum of each series in the bin
+        picks.append(np.ravel(start + np.argmax(values[start:end], axis=0)))  # Maximum of each series in the bin
+    return np.unique(np.concatenate(picks))
+
+
+def zscore_corr(values):
+    """
+    Pearson correlation matrix of the columns of a dense array, as a Gram matrix of z-scores.
+    Args:
+    values (ndarray): 2-D array with one column per instrument and no missing values.
+    Returns:
+    corr (ndarray): Correlation matrix in [-1, 1]; NaN for constant columns, as with DataFrame.corr.
+    """
+    values = values.astype(np.float64)  # Sums over float32 lose precision as the series grows
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (values - values.mean(axis=0)) / values.std(axis=0)
+        return np.clip(np.einsum('ni,nj->ij', z, z) / len(z), -1.0, 1.0)  # Rounding can step just outside [-1, 1]
+
+
+# Structure of arrays over the date-sorted instrument readings, sliced with np.searchsorted instead of through pandas
+solar_dates = solar_data.index.to_numpy()  # Sorted datetime64 dates
+# Column-major, so that each instrument is a contiguous float32 array and the dict below holds views, not copies
+instrument_values = np.asfortranarray(solar_data[instrument_cols].to_numpy(dtype=np.float32))
+solar_arrays = {col: instrument_values[:, k] for k, col in enumerate(instrument_cols)}
+
+# The correlation heatmap only ever shows a subset of this matrix, so compute it once for all instruments
+FULL_CORR = pd.DataFrame(zscore_corr(instrument_values), index=instrument_cols, columns=instrument_cols)  # Full date range
+
+
+@lru_cache(maxsize=64)
+def range_corr(start, end):
+    """
+    Correlation matrix of all instruments over a date range, cached per range.
+    Args:
+    start (Timestamp): Start of the selected date range.
+    end (Timestamp): End of the selected date range.
+    Returns:
+    corr (DataFrame): Correlation matrix indexed by instrument on both axes.
+    """
+    i0 = np.searchsorted(solar_dates, start.to_datetime64(), side='left')
+    i1 = np.searchsorted(solar_dates, end.to_datetime64(), side='right')
+    if i0 == 0 and i1 == len(solar_dates):
+        return FULL_CORR
+    return pd.DataFrame(zscore_corr(instrument_values[i0:i1]), index=instrument_cols, columns=instrument_cols)
+
+
+# Data re-plotted in the browser by the clientside callbacks in assets/dashboard.js, sent once with the layout
+chart_store = {
+    'Date': solar_data.index.astype(str).tolist(),  # ISO dates, compared as strings against the date picker values
+    'instruments': {col: values.tolist() for col, values in solar_arrays.items()},
+    'anomaly_date': solar_data2.index.astype(str).tolist(),
+    'anomaly_score': solar_data2['anomaly_score'].tolist(),
+    'template': pio.templates['plotly'].to_plotly_json()  # Same look as the figures built on the server
+}
+
+# Create the feature importance figure, downsampled on an x-grid shared by all features
+shap_plot_data = shap_data.iloc[m4_indices(shap_data.to_numpy())]
+feature_importance_fig = px.line(shap_plot_data, x=shap_plot_data.index, y=shap_plot_data.columns,
                                  title='Feature Importance Over Time',
                                  labels={'value': 'SHAP Value', 'Date': 'Date'},
-                                 template='plotly')
+                                 template='plotly', render_mode='webgl')
 
 # Initialize the Dash app
 app = dash.Dash(__name__, title="Solar Orbiter Data Visualization")  # Title of the Dash app which is showed in the browser tab
 server = app.server
-    
+
+# Compress the figure JSON, layout and scripts on the wire, with brotli where the browser supports it and gzip otherwise.
+# Flask-Compress's default mimetypes already cover JSON, HTML, CSS and JavaScript.
+server.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+Compress(server)
+
+# Cache the heatmaps built for each (instruments, start date, end date) combination, as the data never changes at runtime.
+# SimpleCache is per process; set CACHE_REDIS_URL to share the cache between gunicorn workers.
+cache_config = {'CACHE_TYPE': 'SimpleCache', 'CACHE_DEFAULT_TIMEOUT': 3600}
+if os.environ.get('CACHE_REDIS_URL'):
+    cache_config.update(CACHE_TYPE='RedisCache', CACHE_REDIS_URL=os.environ['CACHE_REDIS_URL'])
+cache = Cache(app.server, config=cache_config)
+
+# Serve the SHAP plot as a static file the browser can cache, instead of embedding it in every layout response
+shap_plot_path = os.path.abspath("shap_values_plot.html")  # Resolved at import, like the data files
+
+
+@server.route('/shap_values_plot.html')
+def shap_plot():
+    """
+    Serve the SHAP values plot shown in the iframe.
+    Returns:
+    response (Response): The HTML file, cacheable by the browser for a day.
+    """
+    return flask.send_file(shap_plot_path, max_age=86400)
+
+
+# Layout shared by every correlation heatmap, built and validated once
+correlation_layout = go.Figure(layout=dict(title="Correlation Heatmap")).to_dict()['layout']
+
+
+@cache.memoize()
+def build_correlation_fig(instruments, start, end):
+    """
+    Build the correlation heatmap for a selection, memoized on its arguments.
+    Args:
+    instruments (tuple): Sorted tuple of selected instruments.
+    start (Timestamp): Start of the selected date range.
+    end (Timestamp): End of the selected date range.
+    Returns:
+    fig (dict): Figure dict for the correlation heatmap.
+    """
+    selected_instruments = list(instruments)
+    heatmap = dict(
+        type='heatmap',
+        z=range_corr(start, end).loc[selected_instruments, selected_instruments].to_numpy(),  # Slicing the cached correlation matrix
+        x=selected_instruments,  # X-axis labels
+        y=selected_instruments,  # Y-axis labels
+        colorscale='Viridis'  # Color scale
+    )
+    # A plain dict skips the graph_objects validation; only the trace data changes between selections
+    return {'data': [heatmap], 'layout': correlation_layout}  # Return updated figure
+
+
+# The page opens on the first instrument over the full date range; its heatmap is part of the layout,
+# so the server callback does not have to run on every page load
+date_min = solar_data.index.min().date()
+date_max = solar_data.index.max().date()
+default_heatmap = build_correlation_fig((instrument_cols[0],), pd.Timestamp(date_min), pd.Timestamp(date_max))
+
 # Layout of the Dash app
 app.layout = html.Div([
     html.H1("Solar Orbiter Instrument Data Visualization", style={'text-align': 'center'}),  # Title
+    dcc.Store(id='solar-store', data=chart_store),  # Data for the clientside callbacks
     # Checklist to select instruments
     dcc.Checklist(
         id='instrument-checklist',  # Component ID
-        options=[{'label': col, 'value': col} for col in solar_data.columns[1:-2]],  # Options for checklist
+        options=[{'label': col, 'value': col} for col in instrument_cols],  # Options for checklist
         # I have removed the last two columns as they contain anomaly scores, which are not required for visualization.
-        value=[solar_data.columns[1]],  # Default selected value (first instrument)
+        value=[instrument_cols[0]],  # Default selected value (first instrument)
         inline=True
     ),
     # Date range picker
     dcc.DatePickerRange(
         id='date-picker-range',
-        min_date_allowed=solar_data['Date'].min(),  # Minimum date allowed
-        max_date_allowed=solar_data['Date'].max(),  # Maximum date allowed
-        start_date=solar_data['Date'].min(),  # Default start date
-        end_date=solar_data['Date'].max()  # Default end date
+        min_date_allowed=date_min,  # Minimum date allowed
+        max_date_allowed=date_max,  # Maximum date allowed
+        start_date=date_min,  # Default start date
+        end_date=date_max  # Default end date
     ),
     # Two rows, each containing two graphs
     html.Div([
         html.Div([dcc.Graph(id='time-series-chart')], className="six columns"),  # Time Series Chart
-        html.Div([dcc.Graph(id='correlation-heatmap')], className="six columns"),  # Correlation Heatmap
+        html.Div([dcc.Graph(id='correlation-heatmap', figure=default_heatmap)], className="six columns"),  # Correlation Heatmap
     ], className="row"),
     html.Div([
         html.Div([dcc.Graph(id='anomaly-score-chart')], className="six columns"),  # Anomaly Score Chart
     ], className="row"),
     html.Div(id='anomaly-stats', style={'margin-top': '20px', 'text-align': 'center'}),  # Anomaly Stats
     html.Iframe(
-        srcDoc=open("shap_values_plot.html").read(),
+        src='/shap_values_plot.html',
         style={"height": "500px", "width": "100%"}
     ),
     # Add the feature importance graph at the bottom
@@ -63,76 +197,45 @@ app.layout = html.Div([
     ])
 ])
 
-# Callbacks to update graphs
+# Clientside callbacks re-plot the time series and anomaly scores in the browser
+app.clientside_callback(
+    ClientsideFunction(namespace='dashboard', function_name='time_series'),
+    Output('time-series-chart', 'figure'),
+    [Input('instrument-checklist', 'value'),
+     Input('date-picker-range', 'start_date'),
+     Input('date-picker-range', 'end_date')],
+    State('solar-store', 'data')
+)
+app.clientside_callback(
+    ClientsideFunction(namespace='dashboard', function_name='anomaly_scores'),
+    Output('anomaly-score-chart', 'figure'),
+    [Input('date-picker-range', 'start_date'),
+     Input('date-picker-range', 'end_date')],
+    State('solar-store', 'data')
+)
+
+
+# The correlation heatmap stays on the server, where the correlations are cached
 @app.callback(
-    [Output('time-series-chart', 'figure'),
-     Output('correlation-heatmap', 'figure'),
-     Output('anomaly-score-chart', 'figure')],
+    Output('correlation-heatmap', 'figure'),
     [Input('instrument-checklist', 'value'),
      Input('date-picker-range', 'start_date'),
-     Input('date-picker-range', 'end_date')]
+     Input('date-picker-range', 'end_date')],
+    prevent_initial_call=True  # The default heatmap is already in the layout
 )
 def update_graphs(selected_instruments, start_date, end_date):
     """
-    Callback function to update graphs based on user input.
+    Callback function to update the correlation heatmap based on user input.
     Args:
     selected_instruments (list): List of selected instruments.
     start_date (str): Start date selected by the user.
     end_date (str): End date selected by the user.
     Returns:
-    figs (list): List of figures for each graph.
+    fig (dict): Figure for the correlation heatmap.
     """
-    filtered_data = solar_data[(solar_data['Date'] >= start_date) & (solar_data['Date'] <= end_date)]  # Filtering data based on selected date range
-    filtered_data2 = solar_data2[(solar_data2['Date'] >= start_date) & (solar_data2['Date'] <= end_date)]  # Filtering data based on selected date range
-
-    # Time Series Chart
-    time_series_fig = go.Figure()  # Creating a new figure for time series chart
-    for instrument in selected_instruments:
-        time_series_fig.add_trace(
-            go.Scatter(
-                x=filtered_data['Date'],  # X-axis data
-                y=filtered_data[instrument],  # Y-axis data
-                mode='lines+markers',  # Display mode
-                name=instrument  # Instrument name
-            )
-        )
-    time_series_fig.update_layout(title="Time Series of Selected Instruments")  # Updating layout of time series chart
-    
-    # Correlation Heatmap
-    correlation_fig = go.Figure(
-        go.Heatmap(
-            z=filtered_data[selected_instruments].corr(),  # Calculating correlation matrix
-            x=selected_instruments,  # X-axis labels
-            y=selected_instruments,  # Y-axis labels
-            colorscale='Viridis'  # Color scale
-        )
-    )
-    correlation_fig.update_layout(title="Correlation Heatmap")  # Updating layout of correlation heatmap
-    
-    # Anomaly Score Chart
-    anomaly_score_fig = go.Figure()  # Create a new figure for the anomaly score chart
-    anomaly_score_fig.add_trace(go.Scatter(
-        x=filtered_data2['Date'],  # Set the x-axis as the Date column of the filtered data
-        y=filtered_data2['anomaly_score'],  # Set the y-axis as the anomaly_score column of the filtered data
-        mode='lines+markers',  # Display both lines and markers on the graph
-        name='Anomaly Score',  # Name the trace, which will appear in the legend
-        marker=dict(
-            color=[ 'red' if val < 0 else 'blue' for val in filtered_data2['anomaly_score'] ],  # Use list comprehension to assign colors conditionally
-            # Markers will be red if the anomaly score is below 0, otherwise blue
-            size=5,  # Set the size of the markers
-            line=dict(
-                color='DarkSlateGrey',  # Color of the line around each marker
-                width=2  # Width of the line around each marker
-            )
-        )
-    ))
-    anomaly_score_fig.update_layout(
-        title="Anomaly Scores Over Time (Lower the scores, higher chances of anomaly, negative score means definitely anomaly)",  # Main title of the chart
-        xaxis_title='Date',  # Title for the x-axis
-        yaxis_title='Anomaly Score'  # Title for the y-axis
-    )
-    
-    return time_series_fig, correlation_fig, anomaly_score_fig  # Return updated figures
+    # Normalise the inputs so that equivalent selections share a cache entry
+    return build_correlation_fig(tuple(sorted(selected_instruments)), pd.Timestamp(start_date), pd.Timestamp(end_date))
+
 
 """References:
 1. https://dash.plotly.com/ - Dash Documentation
@@ -141,7 +244,8 @@ def update_graphs(selected_instruments, start_date, end_date):
 4. https://dash.plotly.com/dash-html-components - Dash HTML Components (Div, H1 , Iframe)
 5. https://plotly.com/python/plotly-express/ - Plotly Express ( px.line, px.scatter, px.bar)
 6. https://plotly.com/python/graph-objects/ - Plotly Graph Objects ( go.Scatter, go.Heatmap, go.Figure)
-7. https://www.coursera.org/projects/interactive-dashboards-plotly-dash?tab=guided-projects - Coursera Project
+7. https://dash.plotly.com/clientside-callbacks - Clientside Callbacks ( clientside_callback, dcc.Store)
+8. https://www.coursera.org/projects/interactive-dashboards-plotly-dash?tab=guided-projects - Coursera Project
 """
 
 if __name__ == "__main__":
@@ -0,0 +1,99 @@
+// Clientside callbacks that re-plot the data held in the solar-store, so that changing the
+// instrument selection or the date range does not need a roundtrip to the Dash server.
+
+// Position of the first date after value (right) or the first date not before it (left) in the sorted dates
+function bisect(dates, value, right) {
+    var lo = 0, hi = dates.length;
+    while (lo < hi) {
+        var mid = (lo + hi) >> 1;
+        if (dates[mid] < value || (right && dates[mid] === value)) {
+            lo = mid + 1;
+        } else {
+            hi = mid;
+        }
+    }
+    return lo;
+}
+
+// Row positions between the start and end dates (both included); a cleared date leaves that side open
+function dateRange(dates, start, end) {
+    return [start ? bisect(dates, start, false) : 0, end ? bisect(dates, end, true) : dates.length];
+}
+
+// M4 downsampling, as m4_indices in app.py: the first, last, minimum and maximum of each pixel column
+function m4Indices(values, width) {
+    var n = values.length, idx = [];
+    if (n <= 4 * width) {
+        for (var i = 0; i < n; i++) idx.push(i);
+        return idx;
+    }
+    for (var b = 0; b < width; b++) {
+        var start = Math.floor(b * n / width), end = Math.floor((b + 1) * n / width);
+        var lo = start, hi = start;
+        for (var j = start + 1; j < end; j++) {
+            if (values[j] < values[lo]) lo = j;
+            if (values[j] > values[hi]) hi = j;
+        }
+        [start, lo, hi, end - 1].sort(function(a, c) { return a - c; }).forEach(function(p) {
+            if (p !== idx[idx.length - 1]) idx.push(p);  // Bins are in order, so only neighbours can repeat
+        });
+    }
+    return idx;
+}
+
+// Values of arr at the given positions, offset by the start of the date range
+function pick(arr, idx, offset) {
+    return idx.map(function(i) { return arr[offset + i]; });
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    dashboard: {
+        time_series: function(selected, start, end, store) {
+            var range = dateRange(store.Date, start, end);
+            var traces = (selected || []).map(function(instrument) {
+                var values = store.instruments[instrument].slice(range[0], range[1]);
+                var idx = m4Indices(values, 800);  // Keep only the points that can be told apart on screen
+                return {
+                    type: 'scattergl',  // WebGL keeps large series fast to draw
+                    x: pick(store.Date, idx, range[0]),
+                    y: pick(values, idx, 0),
+                    mode: 'lines+markers',
+                    name: instrument
+                };
+            });
+            return {
+                data: traces,
+                layout: {template: store.template, title: {text: 'Time Series of Selected Instruments'}}
+            };
+        },
+        anomaly_scores: function(start, end, store) {
+            var range = dateRange(store.anomaly_date, start, end);
+            var scores = store.anomaly_score.slice(range[0], range[1]);
+            var idx = m4Indices(scores, 800);  // Downsample before building the traces
+            var x = pick(store.anomaly_date, idx, range[0]), y = pick(scores, idx, 0);
+            // One trace per marker colour instead of a colour per point: red below 0, otherwise blue
+            var markers = function(color, name) {
+                return {type: 'scattergl', x: [], y: [], mode: 'markers', name: name, marker: {color: color, size: 5}};
+            };
+            var red = markers('red', 'Score < 0'), blue = markers('blue', 'Score >= 0');
+            for (var i = 0; i < y.length; i++) {
+                var trace = y[i] < 0 ? red : blue;  // Split on the sign in a single pass, without a mask array
+                trace.x.push(x[i]);
+                trace.y.push(y[i]);
+            }
+            return {
+                data: [
+                    {type: 'scattergl', x: x, y: y, mode: 'lines', name: 'Anomaly Score'},
+                    red,
+                    blue
+                ],
+                layout: {
+                    template: store.template,
+                    title: {text: 'Anomaly Scores Over Time (Lower the scores, higher chances of anomaly, negative score means definitely anomaly)'},
+                    xaxis: {title: {text: 'Date'}},
+                    yaxis: {title: {text: 'Anomaly Score'}}
+                }
+            };
+        }
+    }
+});
@@ -0,0 +1,29 @@
+import pandas as pd  # Pandas for reading the CSVs and writing Parquet
+from data import parquet_paths  # Parquet files the dashboard loads
+
+# CSV files exported by the analysis, each converted to the Parquet file the dashboard loads
+csv_paths = [path.replace(".parquet", ".csv") for path in parquet_paths]
+
+
+def convert(csv_path):
+    """
+    Convert a CSV file into a Parquet file next to it, with Date parsed and the values stored as float32.
+    Args:
+    csv_path (str): Path to the CSV file.
+    Returns:
+    parquet_path (str): Path to the written Parquet file.
+    """
+    df = pd.read_csv(csv_path)
+    df['Date'] = pd.to_datetime(df['Date'], infer_datetime_format=True)  # Stored as a timestamp, so never parsed again
+    value_cols = [col for col in df.columns if col != 'Date']
+    df[value_cols] = df[value_cols].astype('float32')
+    parquet_path = csv_path.replace(".csv", ".parquet")
+    # Column chunk statistics let read_parquet skip row groups when filtering on Date
+    df.sort_values('Date').to_parquet(parquet_path, index=False, compression='zstd', row_group_size=100_000)
+    return parquet_path
+
+
+if __name__ == "__main__":
+    # Run from the src directory whenever the CSVs are regenerated
+    for path in csv_paths:
+        print(f"Wrote {convert(path)}")
@@ -0,0 +1,73 @@
+from concurrent.futures import ThreadPoolExecutor  # Read the datasets in parallel at startup
+from functools import lru_cache  # Load each dataset once per process
+import pandas as pd  # Pandas for data manipulation
+import pyarrow.parquet as pq  # Reading Parquet schemas without loading the data
+
+# Parquet files loaded by the dashboard, each written from the CSV of the same name by convert_to_parquet.py
+data_path = "Solar_Orbiter_with_anomalies.parquet"  # Path to dataset file
+data_path2 = "Solar_Orbiter_with_anomalies2.parquet"
+shap_values_path = "shap_values.parquet"  # Update with the correct path to your SHAP values file
+parquet_paths = [data_path, data_path2, shap_values_path]
+
+
+def index_by_date(df):
+    """
+    Use the Date column as a sorted DatetimeIndex.
+    Args:
+    df (DataFrame): DataFrame with a Date column.
+    Returns:
+    df (DataFrame): DataFrame indexed by Date, so date ranges can be sliced with .loc.
+    """
+    return df.sort_values('Date').set_index('Date')
+
+
+@lru_cache(maxsize=1)
+def load_instrument_cols():
+    """
+    Read the instrument names from the Parquet schema, without loading the data.
+    Returns:
+    instrument_cols (list): Instrument columns; Date and the last two columns are not shown as instruments.
+    """
+    return pq.read_schema(data_path).names[1:-2]
+
+
+@lru_cache(maxsize=1)
+def load_solar():
+    """
+    Load the instrument readings; values are stored as float32 and Date as a timestamp.
+    Returns:
+    solar_data (DataFrame): Instrument columns indexed by Date.
+    """
+    return index_by_date(pd.read_parquet(data_path, columns=['Date', *load_instrument_cols()]))
+
+
+@lru_cache(maxsize=1)
+def load_anomalies():
+    """
+    Load the anomaly scores.
+    Returns:
+    solar_data2 (DataFrame): anomaly_score column indexed by Date.
+    """
+    return index_by_date(pd.read_parquet(data_path2, columns=['Date', 'anomaly_score']))
+
+
+@lru_cache(maxsize=1)
+def load_shap():
+    """
+    Load the SHAP values data.
+    Returns:
+    shap_data (DataFrame): SHAP value of each feature indexed by Date.
+    """
+    return index_by_date(pd.read_parquet(shap_values_path))
+
+
+def load_all():
+    """
+    Load the three datasets concurrently; pyarrow releases the GIL while reading, so startup takes
+    about as long as the slowest file rather than the sum of all three.
+    Returns:
+    datasets (tuple): Instrument readings, anomaly scores and SHAP values, as from the load_* functions.
+    """
+    loaders = [load_solar, load_anomalies, load_shap]
+    with ThreadPoolExecutor(len(loaders)) as executor:
+        return tuple(executor.map(lambda load: load(), loaders))